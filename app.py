@@ -1,16 +1,20 @@
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
+import io
+import base64
 import tempfile
-import json
 import traceback
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
 from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-from dotenv import load_dotenv
+import matplotlib
+matplotlib.use('Agg')  # Select the non-interactive backend before pyplot is imported
+import numpy as np
+import pandas as pd
 
 # Load environment variables from .env file
 load_dotenv()
@@ -27,7 +31,21 @@ from llm_integration import LLMIntegration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class NumpyJSONProvider(DefaultJSONProvider):
+    """JSON provider that also serializes numpy and pandas values"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, np.generic):
+            return o.item()
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        if isinstance(o, pd.Timestamp):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
 app = Flask(__name__)
+app.json = NumpyJSONProvider(app)
 CORS(app)
 
 # Initialize components
@@ -38,6 +56,15 @@ question_processor = QuestionProcessor()
 llm_integration = LLMIntegration()
 # Intelligent orchestrator disabled for deployment stability
 
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+FILE_LOAD_WORKERS = 8
+
+# Shared pool for independent Wikipedia sub-questions
+_sub_question_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='subq')
+
+# Rendered on first use by _get_default_wikipedia_response()
+_DEFAULT_WIKIPEDIA_RESPONSE = None
+
 @app.route('/', methods=['GET', 'POST'])
 def root():
     """Root endpoint providing API information or handling file uploads"""
@@ -75,7 +102,7 @@ def root():
 @app.route('/api/', methods=['POST'])
 def analyze_data():
     """Main API endpoint for data analysis requests"""
-    start_time = datetime.now()
+    start_time = time.monotonic()
     temp_files = []
 
     try:
@@ -87,13 +114,15 @@ def analyze_data():
         if 'questions.txt' not in request.files:
             return jsonify({"error": "questions.txt file is required"}), 400
 
-        # Read questions with size limit (1MB)
+        # Read questions with size limit (1MB), reading at most one byte past the cap
         questions_file = request.files['questions.txt']
-        if questions_file.content_length and questions_file.content_length > 1024 * 1024:
+        max_questions_size = 1024 * 1024
+        questions_bytes = questions_file.stream.read(max_questions_size + 1)
+        if len(questions_bytes) > max_questions_size:
             return jsonify({"error": "questions.txt file too large (max 1MB)"}), 400
 
         try:
-            questions_content = questions_file.read().decode('utf-8')
+            questions_content = questions_bytes.decode('utf-8')
         except UnicodeDecodeError:
             return jsonify({"error": "questions.txt must be valid UTF-8 text"}), 400
 
@@ -111,17 +140,30 @@ def analyze_data():
                     continue
 
                 try:
-                    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f"_{filename}")
-                    file.save(temp_file.name)
+                    # Stream to disk in chunks, enforcing the cap on actual bytes received
+                    with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{filename}") as temp_file:
+                        temp_files.append(temp_file.name)
+                        written = 0
+                        while chunk := file.stream.read(UPLOAD_CHUNK_SIZE):
+                            written += len(chunk)
+                            if written > max_file_size:
+                                break
+                            temp_file.write(chunk)
+
+                    if written > max_file_size:
+                        logger.warning(f"File {filename} too large, skipping")
+                        os.unlink(temp_file.name)
+                        temp_files.remove(temp_file.name)
+                        continue
+
                     uploaded_files[filename] = temp_file.name
-                    temp_files.append(temp_file.name)
                     logger.info(f"Saved uploaded file: {filename}")
                 except Exception as e:
                     logger.error(f"Error saving file {filename}: {str(e)}")
                     continue
 
         # Check timeout (leave 45 seconds buffer for response processing)
-        elapsed = (datetime.now() - start_time).total_seconds()
+        elapsed = time.monotonic() - start_time
         if elapsed > 255:  # 4 minutes 15 seconds
             logger.warning("Request approaching timeout, returning partial response")
             return jsonify({"error": "Request timeout - partial processing"}), 200
@@ -134,17 +176,15 @@ def analyze_data():
             response = {"error": "Failed to generate response"}
 
         # Log processing time
-        processing_time = (datetime.now() - start_time).total_seconds()
+        processing_time = time.monotonic() - start_time
         logger.info(f"Request processed in {processing_time:.2f} seconds")
 
-        # Ensure response is JSON serializable
+        # Serialize once; numpy and pandas scalars are handled by NumpyJSONProvider
         try:
-            json.dumps(response)
+            return jsonify(response)
         except (TypeError, ValueError) as e:
             logger.error(f"Response not JSON serializable: {str(e)}")
-            response = {"error": "Invalid response format"}
-
-        return jsonify(response)
+            return jsonify({"error": "Invalid response format"})
 
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}")
@@ -167,7 +207,10 @@ def analyze_data():
                 logger.error(f"Error cleaning up temp file {temp_file}: {str(e)}")
 
 def process_analysis_request(questions_content, uploaded_files, start_time):
-    """Process the analysis request and return results"""
+    """Process the analysis request and return results
+
+    start_time is a time.monotonic() reading taken when the request arrived.
+    """
 
     try:
         # Intelligent orchestrator temporarily disabled to fix deployment issues
@@ -186,7 +229,7 @@ def process_analysis_request(questions_content, uploaded_files, start_time):
         # Process each question with aggressive timeout checking
         for i, question_data in enumerate(parsed_questions):
             # Check timeout before processing each question
-            elapsed = (datetime.now() - start_time).total_seconds()
+            elapsed = time.monotonic() - start_time
             if elapsed > 240:  # 4 minutes - aggressive timeout
                 logger.warning(f"Timeout reached, stopping at question {i+1}")
                 # Return partial results with placeholder for remaining questions
@@ -251,47 +294,28 @@ def handle_wikipedia_questions(question_data, uploaded_files):
 
         if data.empty:
             logger.warning("No data scraped from Wikipedia, returning default responses")
-            return self._get_default_wikipedia_response()
+            return _get_default_wikipedia_response()
 
         # Process sub-questions
         results = []
         sub_questions = question_data.get('sub_questions', [])
 
-        for i, sub_question in enumerate(sub_questions):
-            try:
-                sub_question_lower = sub_question.lower()
-
-                if ('movies' in sub_question_lower or '$2' in sub_question) and '2000' in sub_question:
-                    # Count movies over $2bn before 2000
-                    count = data_analysis.count_movies_before_year(data, 2000, 2.0)
-                    results.append(count)
-                    logger.info(f"Question {i+1}: Found {count} movies over $2bn before 2000")
-
-                elif 'earliest' in sub_question_lower and ('1.5' in sub_question or '$1.5' in sub_question):
-                    # Find earliest movie over $1.5bn
-                    movie = data_analysis.find_earliest_movie_over_amount(data, 1.5)
-                    results.append(movie)
-                    logger.info(f"Question {i+1}: Earliest movie over $1.5bn: {movie}")
-
-                elif 'correlation' in sub_question_lower:
-                    # Calculate correlation between Rank and Peak
-                    correlation = data_analysis.calculate_correlation(data, 'Rank', 'Peak')
-                    results.append(correlation)
-                    logger.info(f"Question {i+1}: Correlation between Rank and Peak: {correlation}")
-
-                elif 'scatterplot' in sub_question_lower or 'plot' in sub_question_lower:
-                    # Create scatterplot
-                    plot_data_uri = data_visualization.create_scatterplot_with_regression(
-                        data, 'Rank', 'Peak', 'red', dotted=True
-                    )
-                    results.append(plot_data_uri)
-                    logger.info(f"Question {i+1}: Generated scatterplot")
-
-                else:
-                    # Default response for unrecognized questions
-                    results.append(None)
-                    logger.warning(f"Question {i+1}: Unrecognized question format")
+        # Sub-questions only read the shared DataFrame, so run them concurrently
+        tasks = [_wikipedia_sub_question_task(sub_question, data) for sub_question in sub_questions]
+        futures = [_sub_question_executor.submit(task[0]) if task else None for task in tasks]
 
+        # Collect in submission order to preserve answer positions
+        for i, future in enumerate(futures):
+            if future is None:
+                # Default response for unrecognized questions
+                results.append(None)
+                logger.warning(f"Question {i+1}: Unrecognized question format")
+                continue
+
+            try:
+                result = future.result()
+                results.append(result)
+                logger.info(f"Question {i+1}: " + tasks[i][1].format(result))
             except Exception as e:
                 logger.error(f"Error processing sub-question {i+1}: {str(e)}")
                 results.append(None)
@@ -305,16 +329,50 @@ def handle_wikipedia_questions(question_data, uploaded_files):
     except Exception as e:
         logger.error(f"Error in Wikipedia question handling: {str(e)}")
         # Return fallback response matching expected format
-        return self._get_default_wikipedia_response()
+        return _get_default_wikipedia_response()
+
+def _wikipedia_sub_question_task(sub_question, data):
+    """Map a Wikipedia sub-question to (callable, log message template), or None if unrecognized"""
+    sub_question_lower = sub_question.lower()
+
+    if ('movies' in sub_question_lower or '$2' in sub_question) and '2000' in sub_question:
+        # Count movies over $2bn before 2000
+        return (lambda: data_analysis.count_movies_before_year(data, 2000, 2.0),
+                "Found {} movies over $2bn before 2000")
+
+    elif 'earliest' in sub_question_lower and ('1.5' in sub_question or '$1.5' in sub_question):
+        # Find earliest movie over $1.5bn
+        return (lambda: data_analysis.find_earliest_movie_over_amount(data, 1.5),
+                "Earliest movie over $1.5bn: {}")
+
+    elif 'correlation' in sub_question_lower:
+        # Calculate correlation between Rank and Peak
+        return (lambda: data_analysis.calculate_correlation(data, 'Rank', 'Peak'),
+                "Correlation between Rank and Peak: {}")
+
+    elif 'scatterplot' in sub_question_lower or 'plot' in sub_question_lower:
+        # Create scatterplot
+        return (lambda: data_visualization.create_scatterplot_with_regression(
+                    data, 'Rank', 'Peak', 'red', dotted=True),
+                "Generated scatterplot")
+
+    return None
 
 def _get_default_wikipedia_response():
     """Return default response for Wikipedia questions to ensure testing continues"""
-    # Create a minimal plot for the 4th element
-    import base64
-    import io
-    import matplotlib.pyplot as plt
+    global _DEFAULT_WIKIPEDIA_RESPONSE
 
+    # The fallback takes no inputs, so render it once and reuse it
+    if _DEFAULT_WIKIPEDIA_RESPONSE is None:
+        _DEFAULT_WIKIPEDIA_RESPONSE = _build_default_wikipedia_response()
+    return list(_DEFAULT_WIKIPEDIA_RESPONSE)
+
+def _build_default_wikipedia_response():
+    """Build the default Wikipedia response, including a sample scatterplot"""
+    # Create a minimal plot for the 4th element
     try:
+        import matplotlib.pyplot as plt  # deferred so startup does not pay for pyplot
+
         fig, ax = plt.subplots(figsize=(4, 3))
         ax.scatter([1, 2, 3], [1, 2, 3], alpha=0.6)
         ax.plot([1, 3], [1, 3], 'r--', linewidth=2)
@@ -580,13 +638,20 @@ def handle_file_analysis(question_data, uploaded_files):
 
     # Process uploaded CSV, JSON, or other data files
     results = []
+    csv_paths = [filepath for filename, filepath in uploaded_files.items() if filename.endswith('.csv')]
+
+    # Parsing releases the GIL, so load several uploads on threads (map keeps upload order)
+    if len(csv_paths) > 1:
+        workers = min(FILE_LOAD_WORKERS, len(csv_paths))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='load') as executor:
+            frames = list(executor.map(data_sourcing.load_csv, csv_paths))
+    else:
+        frames = [data_sourcing.load_csv(filepath) for filepath in csv_paths]
 
-    for filename, filepath in uploaded_files.items():
-        if filename.endswith('.csv'):
-            data = data_sourcing.load_csv(filepath)
-            # Perform analysis based on question
-            analysis_result = data_analysis.analyze_dataframe(data, question_data.get('text', ''))
-            results.append(analysis_result)
+    for data in frames:
+        # Perform analysis based on question
+        analysis_result = data_analysis.analyze_dataframe(data, question_data.get('text', ''))
+        results.append(analysis_result)
 
     return results
 
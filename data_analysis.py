@@ -1,16 +1,27 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
-from sklearn.linear_model import LinearRegression
 import logging
 from typing import Any, Optional, Tuple, List, Dict
 from datetime import datetime, timedelta
 import re
 import networkx as nx
 from collections import Counter
+from functools import reduce
+from network_kernels import build_csr, _degree_stats, _bfs_shortest_path
 
 logger = logging.getLogger(__name__)
 
+
+def _pearson(x: pd.Series, y: pd.Series) -> float:
+    """Pearson correlation over rows where both values are present (NaN if undefined)"""
+    arr = np.column_stack([x.to_numpy(dtype=np.float64, na_value=np.nan),
+                           y.to_numpy(dtype=np.float64, na_value=np.nan)])
+    arr = arr[~np.isnan(arr).any(axis=1)]
+    if arr.shape[0] < 2:
+        return float('nan')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.corrcoef(arr, rowvar=False)[0, 1])
+
 class DataAnalysis:
     """Handles statistical analysis and data processing"""
     
@@ -23,13 +34,13 @@ class DataAnalysis:
             if df.empty:
                 return 0
             
-            # Filter by year and gross
-            filtered = df[
-                (df['Year'] < year) & 
-                (df['Worldwide gross'] >= gross_threshold)
-            ]
-            
-            count = len(filtered)
+            # Reduce both masks in NumPy instead of materializing a filtered frame
+            years = df['Year'].to_numpy(dtype=np.float64, na_value=np.nan)
+            gross = df['Worldwide gross'].to_numpy(dtype=np.float64, na_value=np.nan)
+            mask = np.less(years, year)
+            np.logical_and(mask, gross >= gross_threshold, out=mask)
+
+            count = int(mask.sum())
             logger.info(f"Found {count} movies grossing over ${gross_threshold}bn before {year}")
             return count
             
@@ -43,15 +54,18 @@ class DataAnalysis:
             if df.empty:
                 return "No data available"
             
-            # Filter movies over threshold
-            filtered = df[df['Worldwide gross'] >= gross_threshold]
+            # Filter movies over threshold (only the Year column is needed)
+            over_threshold = df['Worldwide gross'] >= gross_threshold
             
-            if filtered.empty:
+            if not over_threshold.any():
                 return "No movies found over threshold"
             
-            # Find earliest by year
-            earliest = filtered.loc[filtered['Year'].idxmin()]
-            title = earliest.get('Title', 'Unknown')
+            # Find earliest by year and read the title cell directly
+            try:
+                idx = df['Year'][over_threshold].idxmin()
+                title = df.at[idx, 'Title']
+            except (KeyError, ValueError):
+                title = 'Unknown'
             
             logger.info(f"Earliest movie over ${gross_threshold}bn: {title}")
             return title
@@ -66,19 +80,18 @@ class DataAnalysis:
             if df.empty or col1 not in df.columns or col2 not in df.columns:
                 return 0.0
             
-            # Remove non-numeric values
-            clean_df = df[[col1, col2]].dropna()
-            clean_df = clean_df[
-                pd.to_numeric(clean_df[col1], errors='coerce').notna() &
-                pd.to_numeric(clean_df[col2], errors='coerce').notna()
-            ]
+            # Coerce both columns into one float64 buffer and drop non-numeric rows
+            arr = df[[col1, col2]].apply(pd.to_numeric, errors='coerce').to_numpy(
+                dtype=np.float64, na_value=np.nan)
+            arr = arr[~np.isnan(arr).any(axis=1)]
             
-            if len(clean_df) < 2:
+            if arr.shape[0] < 2:
                 return 0.0
             
-            correlation = clean_df[col1].astype(float).corr(clean_df[col2].astype(float))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                correlation = float(np.corrcoef(arr[:, 0], arr[:, 1])[0, 1])
             
-            if pd.isna(correlation):
+            if not np.isfinite(correlation):
                 return 0.0
             
             logger.info(f"Correlation between {col1} and {col2}: {correlation:.6f}")
@@ -94,22 +107,22 @@ class DataAnalysis:
             if df.empty or x_col not in df.columns or y_col not in df.columns:
                 return 0.0
             
-            # Clean data
-            clean_df = df[[x_col, y_col]].dropna()
-            clean_df[x_col] = pd.to_numeric(clean_df[x_col], errors='coerce')
-            clean_df[y_col] = pd.to_numeric(clean_df[y_col], errors='coerce')
-            clean_df = clean_df.dropna()
+            # Clean data as float64 arrays in one masking pass
+            x = pd.to_numeric(df[x_col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            y = pd.to_numeric(df[y_col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            mask = np.isfinite(x) & np.isfinite(y)
+            x = x[mask]
+            y = y[mask]
             
-            if len(clean_df) < 2:
+            if x.size < 2:
                 return 0.0
             
-            X = clean_df[x_col].values.reshape(-1, 1)
-            y = clean_df[y_col].values
-            
-            model = LinearRegression()
-            model.fit(X, y)
-            
-            slope = model.coef_[0]
+            # Closed-form OLS slope: cov(x, y) / var(x)
+            xc = x - x.mean()
+            sxx = np.dot(xc, xc)
+            if sxx == 0:
+                return 0.0
+            slope = float(np.dot(xc, y - y.mean()) / sxx)
             logger.info(f"Regression slope for {x_col} vs {y_col}: {slope}")
             return slope
             
@@ -142,22 +155,24 @@ class DataAnalysis:
             if df.empty or group_col not in df.columns:
                 return pd.DataFrame()
             
-            # Apply filters if provided
-            filtered_df = df.copy()
+            # Combine filter conditions into a single row mask
+            masks = []
             if filter_conditions:
                 for col, condition in filter_conditions.items():
-                    if col in filtered_df.columns:
+                    if col in df.columns:
                         if isinstance(condition, dict):
                             if 'min' in condition:
-                                filtered_df = filtered_df[filtered_df[col] >= condition['min']]
+                                masks.append((df[col] >= condition['min']).to_numpy(dtype=bool, na_value=False))
                             if 'max' in condition:
-                                filtered_df = filtered_df[filtered_df[col] <= condition['max']]
+                                masks.append((df[col] <= condition['max']).to_numpy(dtype=bool, na_value=False))
                         else:
-                            filtered_df = filtered_df[filtered_df[col] == condition]
+                            masks.append((df[col] == condition).to_numpy(dtype=bool, na_value=False))
+            mask = reduce(np.logical_and, masks, np.ones(len(df), dtype=bool))
             
-            # Group and count
-            result = filtered_df.groupby(group_col).size().reset_index(name='count')
-            result = result.sort_values('count', ascending=False)
+            # Group and count, touching only the grouping column
+            filtered = df.loc[mask, [group_col]]
+            result = filtered.groupby(group_col, sort=False, observed=True).size().reset_index(name='count')
+            result = result.sort_values('count', ascending=False, kind='stable')
             
             return result
             
@@ -170,36 +185,38 @@ class DataAnalysis:
         try:
             question_lower = question.lower()
             
+            is_correlation = 'correlation' in question_lower
+            
+            # Counting only needs the row count, so answer it before inspecting dtypes
+            if not is_correlation and ('count' in question_lower or 'how many' in question_lower):
+                return len(df)
+            
+            numeric_cols = df.select_dtypes(include=[np.number]).columns
+            first_num = numeric_cols[0] if len(numeric_cols) else None
+            
             # Simple keyword-based analysis
-            if 'correlation' in question_lower:
+            if is_correlation:
                 # Find numeric columns for correlation
-                numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
                 if len(numeric_cols) >= 2:
                     return self.calculate_correlation(df, numeric_cols[0], numeric_cols[1])
             
-            elif 'count' in question_lower or 'how many' in question_lower:
-                return len(df)
-            
             elif 'mean' in question_lower or 'average' in question_lower:
-                numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-                if numeric_cols:
-                    return df[numeric_cols[0]].mean()
+                if first_num is not None:
+                    return df[first_num].mean()
             
             elif 'max' in question_lower or 'maximum' in question_lower:
-                numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-                if numeric_cols:
-                    return df[numeric_cols[0]].max()
+                if first_num is not None:
+                    return df[first_num].max()
             
             elif 'min' in question_lower or 'minimum' in question_lower:
-                numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-                if numeric_cols:
-                    return df[numeric_cols[0]].min()
+                if first_num is not None:
+                    return df[first_num].min()
             
             # Default: return basic statistics
             return {
                 'rows': len(df),
                 'columns': len(df.columns),
-                'column_names': df.columns.tolist()
+                'column_names': list(df.columns)
             }
             
         except Exception as e:
@@ -212,24 +229,26 @@ class DataAnalysis:
             if df.empty:
                 return {}
             
+            dtypes = df.dtypes
+            missing = df.isnull().sum()
             stats = {
                 'shape': df.shape,
                 'columns': df.columns.tolist(),
-                'dtypes': df.dtypes.to_dict(),
-                'missing_values': df.isnull().sum().to_dict(),
+                'dtypes': dtypes.to_dict(),
+                'missing_values': missing.to_dict(),
                 'numeric_summary': {}
             }
             
-            # Add numeric column statistics
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            for col in numeric_cols:
-                stats['numeric_summary'][col] = {
-                    'mean': df[col].mean(),
-                    'median': df[col].median(),
-                    'std': df[col].std(),
-                    'min': df[col].min(),
-                    'max': df[col].max()
-                }
+            # Add numeric column statistics as block-wise reductions over all numeric columns
+            numeric_df = df.select_dtypes(include=[np.number])
+            if not numeric_df.columns.empty:
+                summary = numeric_df.agg(['mean', 'median', 'std', 'min', 'max']).to_dict()
+                # The combined frame upcasts to float, so take integer extremes per column
+                for col in numeric_df.columns:
+                    if pd.api.types.is_integer_dtype(numeric_df[col]):
+                        summary[col]['min'] = numeric_df[col].min()
+                        summary[col]['max'] = numeric_df[col].max()
+                stats['numeric_summary'] = summary
             
             return stats
             
@@ -240,26 +259,26 @@ class DataAnalysis:
     def analyze_network(self, edges_df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze network data from edges DataFrame"""
         try:
-            # Create networkx graph
+            # Create networkx graph (used for visualization)
             G = nx.from_pandas_edgelist(edges_df, source='source', target='target')
 
-            # Calculate network metrics
-            edge_count = G.number_of_edges()
-
-            # Find highest degree node
-            degrees = dict(G.degree())
-            highest_degree_node = max(degrees, key=degrees.get)
-
-            # Calculate average degree
-            average_degree = sum(degrees.values()) / len(degrees)
+            # Compute metrics on CSR adjacency arrays
+            indptr, indices, nodes, edge_count = build_csr(edges_df)
+            n = len(nodes)
+            degree_array, highest_idx, average_degree = _degree_stats(indptr, n)
+            average_degree = float(average_degree)
+            degrees = dict(zip(nodes, degree_array.tolist()))
+            highest_degree_node = nodes[highest_idx]
 
             # Calculate density
-            density = nx.density(G)
+            density = 2 * edge_count / (n * (n - 1)) if n > 1 else 0.0
 
             # Calculate shortest path between Alice and Eve
-            try:
-                shortest_path_alice_eve = nx.shortest_path_length(G, 'Alice', 'Eve')
-            except nx.NetworkXNoPath:
+            node_index = {node: i for i, node in enumerate(nodes)}
+            if 'Alice' in node_index and 'Eve' in node_index:
+                shortest_path_alice_eve = int(_bfs_shortest_path(
+                    indptr, indices, node_index['Alice'], node_index['Eve']))
+            else:
                 shortest_path_alice_eve = -1  # No path exists
 
             return {
@@ -288,7 +307,7 @@ class DataAnalysis:
 
             # Calculate correlation between day of month and sales
             sales_df['day'] = pd.to_datetime(sales_df['date']).dt.day
-            day_sales_correlation = sales_df['day'].corr(sales_df['sales'])
+            day_sales_correlation = _pearson(sales_df['day'], sales_df['sales'])
 
             # Calculate median sales
             median_sales = sales_df['sales'].median()
@@ -324,7 +343,7 @@ class DataAnalysis:
             min_temp_c = weather_df['temperature_c'].min()
 
             # Calculate correlation between temperature and precipitation
-            temp_precip_correlation = weather_df['temperature_c'].corr(weather_df['precip_mm'])
+            temp_precip_correlation = _pearson(weather_df['temperature_c'], weather_df['precip_mm'])
 
             # Calculate average precipitation
             average_precip_mm = weather_df['precip_mm'].mean()
@@ -1,23 +1,81 @@
-import matplotlib.pyplot as plt
+from __future__ import annotations
+
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
-import seaborn as sns
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LinearRegression
-import base64
+try:
+    import pybase64 as base64  # SIMD base64; same b64encode API as the stdlib module
+except ImportError:
+    import base64
+from PIL import Image
 import io
 import logging
-from typing import Optional, Tuple, Dict, Any
-import networkx as nx
-from collections import Counter
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional, Tuple, Dict, Any, List
+
+if TYPE_CHECKING:
+    import networkx as nx
+    from matplotlib.figure import Figure
+
+try:
+    import igraph as ig
+except ImportError:  # python-igraph is optional; large graphs fall back to spring_layout
+    ig = None
 
 logger = logging.getLogger(__name__)
 
-class DataVisualization:
-    """Handles data visualization and chart generation"""
+# 1x1 PNG returned when even a placeholder plot cannot be rendered
+_FALLBACK_PNG_URI = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+
+# zlib level for PNG output. Lower levels barely save time next to rendering but make
+# plots much larger (level 1 is ~50% bigger than 6 on a scatterplot), and 9 doubles encode
+# time for no gain, so the size-capped data URIs use the balanced default
+PNG_COMPRESS_LEVEL = 6
+
+# Placeholder messages whose rendered data URIs are kept for reuse
+PLACEHOLDER_CACHE_SIZE = 64
+
+# Points drawn in a scatterplot; the regression is always fit on every row
+SCATTER_MAX_POINTS = 2000
+
+LAYOUT_CACHE_SIZE = 32
+
+# Idle figures kept per figsize for reuse
+FIG_POOL_SIZE = 4
+
+# Points drawn in a line chart; longer series are decimated first
+LINE_MAX_POINTS = 500
+
+# Graphs smaller than this get the full 50-iteration spring layout
+SPRING_FULL_ITERATIONS_MAX_NODES = 30
+
+# Graphs at least this large are laid out with igraph's C Fruchterman-Reingold when available
+IGRAPH_LAYOUT_MIN_NODES = 200
+
+# pyplot, seaborn and networkx are imported by _lazy_init on the first plot
+_INITIALIZED = False
+_init_lock = threading.Lock()
+
+
+def _lazy_init() -> None:
+    """Import the plotting stack and apply the chart style once per process"""
+    global _INITIALIZED, plt, sns, nx, Figure, FigureCanvasAgg, LineCollection
+    if _INITIALIZED:
+        return
     
-    def __init__(self):
+    with _init_lock:
+        if _INITIALIZED:
+            return
+        
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        import networkx as nx
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.collections import LineCollection
+        
         # Set style
         plt.style.use('default')
         sns.set_palette("husl")
@@ -31,45 +89,114 @@ class DataVisualization:
         plt.rcParams['xtick.labelsize'] = 10
         plt.rcParams['ytick.labelsize'] = 10
         plt.rcParams['legend.fontsize'] = 10
+        # Let Agg stroke very long line paths in chunks
+        plt.rcParams['agg.path.chunksize'] = 10000
+        
+        _INITIALIZED = True
+
+
+class DataVisualization:
+    """Handles data visualization and chart generation"""
+    
+    # Rendered placeholder data URIs by message, LRU-ordered and shared by all instances
+    _placeholder_cache: OrderedDict[str, str] = OrderedDict()
+    _placeholder_cache_lock = threading.Lock()
+    
+    def __init__(self):
+        # Plot style is applied by _lazy_init when the first figure is requested
+        
+        # Idle figures per figsize, cleared and handed back out instead of reallocated per plot
+        self._fig_pool: Dict[Tuple[int, int], List[Figure]] = {}
+        self._fig_pool_lock = threading.Lock()
+        
+        # One reusable PNG buffer per thread for _render_and_encode
+        self._png_buffers = threading.local()
+        
+        # Spring layouts keyed by the graph's node and edge sequence (LRU)
+        self._layout_cache = OrderedDict()
+        self._layout_cache_lock = threading.Lock()
+    
+    def _acquire_fig(self, figsize: Tuple[int, int]):
+        """Take an idle pooled figure of the given size (or create one) with a single axes"""
+        _lazy_init()
+        
+        with self._fig_pool_lock:
+            idle = self._fig_pool.get(figsize)
+            fig = idle.pop() if idle else None
+        
+        if fig is None:
+            # Built outside pyplot so the figure is never registered as a managed window
+            fig = Figure(figsize=figsize)
+            FigureCanvasAgg(fig)
+        
+        ax = fig.add_subplot(111)
+        return fig, ax
+    
+    def _release_fig(self, fig: Figure) -> None:
+        """Clear a figure and return it to the pool for the next plot of the same size"""
+        fig.clear()
+        fig.set_dpi(matplotlib.rcParams['figure.dpi'])
+        figsize = tuple(int(v) for v in fig.get_size_inches())
+        with self._fig_pool_lock:
+            idle = self._fig_pool.setdefault(figsize, [])
+            if len(idle) < FIG_POOL_SIZE:
+                idle.append(fig)
     
     def create_scatterplot_with_regression(self, df: pd.DataFrame, x_col: str, y_col: str, 
                                          line_color: str = 'red', dotted: bool = True, 
-                                         max_size_kb: int = 100) -> str:
+                                         max_size_kb: Optional[int] = 100) -> str:
         """Create scatterplot with regression line and return as base64 data URI"""
         try:
             if df.empty or x_col not in df.columns or y_col not in df.columns:
                 return self._create_placeholder_plot("No data available")
             
-            # Clean data
-            clean_df = df[[x_col, y_col]].dropna()
-            clean_df[x_col] = pd.to_numeric(clean_df[x_col], errors='coerce')
-            clean_df[y_col] = pd.to_numeric(clean_df[y_col], errors='coerce')
-            clean_df = clean_df.dropna()
+            # Clean data as float64 arrays, reused for drawing and fitting
+            x = pd.to_numeric(df[x_col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            y = pd.to_numeric(df[y_col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            mask = np.isfinite(x) & np.isfinite(y)
+            x = x[mask]
+            y = y[mask]
             
-            if len(clean_df) < 2:
+            if x.size < 2:
                 return self._create_placeholder_plot("Insufficient data for plot")
             
             # Create figure
-            fig, ax = plt.subplots(figsize=(10, 8))
-            
-            # Create scatterplot
-            ax.scatter(clean_df[x_col], clean_df[y_col], alpha=0.6, s=50)
-            
-            # Add regression line
-            X = clean_df[x_col].values.reshape(-1, 1)
-            y = clean_df[y_col].values
-            
-            model = LinearRegression()
-            model.fit(X, y)
-            
-            # Generate regression line points
-            x_range = np.linspace(clean_df[x_col].min(), clean_df[x_col].max(), 100)
-            y_pred = model.predict(x_range.reshape(-1, 1))
+            fig, ax = self._acquire_fig((10, 8))
+            
+            # Create scatterplot from a fixed random sample when there are too many points
+            # (the same rows DataFrame.sample(random_state=0) would pick)
+            if len(x) > SCATTER_MAX_POINTS:
+                sample = np.random.RandomState(0).choice(len(x), SCATTER_MAX_POINTS, replace=False)
+                x_plot, y_plot = x[sample], y[sample]
+            else:
+                x_plot, y_plot = x, y
+            
+            # Rasterized so vector outputs (SVG/PDF) embed the markers as one image
+            ax.scatter(x_plot, y_plot, alpha=0.6, s=50, rasterized=True)
+            
+            # Add regression line (closed-form OLS fit)
+            x_mean = x.mean()
+            y_mean = y.mean()
+            xc = x - x_mean
+            yc = y - y_mean
+            sxx = np.dot(xc, xc)
+            slope = np.dot(xc, yc) / sxx if sxx else 0.0
+            intercept = y_mean - slope * x_mean
+            
+            # R² as reported by the fitted line; a constant target is a perfect fit
+            residuals = yc - slope * xc
+            ss_res = np.dot(residuals, residuals)
+            ss_tot = np.dot(yc, yc)
+            r2 = 1 - ss_res / ss_tot if ss_tot else (1.0 if ss_res == 0 else 0.0)
+            
+            # A straight line only needs its two end points
+            x_range = np.array([x.min(), x.max()])
+            y_pred = slope * x_range + intercept
             
             # Plot regression line
             line_style = '--' if dotted else '-'
             ax.plot(x_range, y_pred, color=line_color, linestyle=line_style, linewidth=2, 
-                   label=f'Regression Line (R² = {model.score(X, y):.3f})')
+                   label=f'Regression Line (R² = {r2:.3f})')
             
             # Customize plot
             ax.set_xlabel(x_col)
@@ -79,11 +206,11 @@ class DataVisualization:
             ax.grid(True, alpha=0.3)
             
             # Adjust layout
-            plt.tight_layout()
+            fig.tight_layout()
             
             # Convert to base64
             data_uri = self._fig_to_base64(fig, max_size_kb)
-            plt.close(fig)
+            self._release_fig(fig)
             
             logger.info(f"Created scatterplot with regression line")
             return data_uri
@@ -92,8 +219,25 @@ class DataVisualization:
             logger.error(f"Error creating scatterplot: {str(e)}")
             return self._create_placeholder_plot(f"Error: {str(e)}")
     
+    def _decimation_positions(self, n: int, n_max: int = LINE_MAX_POINTS) -> Optional[np.ndarray]:
+        """Positions of every k-th point so at most about n_max are drawn, always keeping the last;
+        None when n is already small enough"""
+        if n <= n_max:
+            return None
+        
+        step = -(-n // n_max)
+        positions = np.arange(0, n, step)
+        if positions[-1] != n - 1:
+            positions = np.append(positions, n - 1)
+        return positions
+    
+    def _decimate(self, df: pd.DataFrame, n_max: int = LINE_MAX_POINTS) -> pd.DataFrame:
+        """Keep every k-th row so at most about n_max points are drawn, always keeping the last row"""
+        positions = self._decimation_positions(len(df), n_max)
+        return df if positions is None else df.iloc[positions]
+    
     def create_line_plot(self, df: pd.DataFrame, x_col: str, y_col: str, 
-                        title: Optional[str] = None, max_size_kb: int = 100) -> str:
+                        title: Optional[str] = None, max_size_kb: Optional[int] = 100) -> str:
         """Create line plot and return as base64 data URI"""
         try:
             if df.empty or x_col not in df.columns or y_col not in df.columns:
@@ -107,10 +251,11 @@ class DataVisualization:
                 return self._create_placeholder_plot("Insufficient data for plot")
             
             # Create figure
-            fig, ax = plt.subplots(figsize=(10, 6))
+            fig, ax = self._acquire_fig((10, 6))
             
             # Create line plot
-            ax.plot(clean_df[x_col], clean_df[y_col], marker='o', linewidth=2, markersize=4)
+            plot_df = self._decimate(clean_df)
+            ax.plot(plot_df[x_col], plot_df[y_col], marker='o', linewidth=2, markersize=4)
             
             # Customize plot
             ax.set_xlabel(x_col)
@@ -119,12 +264,12 @@ class DataVisualization:
             ax.grid(True, alpha=0.3)
             
             # Adjust layout
-            plt.tight_layout()
+            fig.tight_layout()
             
             # Convert to base64
             data_uri = self._fig_to_base64(fig, max_size_kb)
-            plt.close(fig)
             
+            self._release_fig(fig)
             return data_uri
             
         except Exception as e:
@@ -132,7 +277,7 @@ class DataVisualization:
             return self._create_placeholder_plot(f"Error: {str(e)}")
     
     def create_bar_chart(self, df: pd.DataFrame, x_col: str, y_col: str, 
-                        title: Optional[str] = None, max_size_kb: int = 100) -> str:
+                        title: Optional[str] = None, max_size_kb: Optional[int] = 100) -> str:
         """Create bar chart and return as base64 data URI"""
         try:
             if df.empty or x_col not in df.columns or y_col not in df.columns:
@@ -142,7 +287,7 @@ class DataVisualization:
             plot_df = df.head(20)
             
             # Create figure
-            fig, ax = plt.subplots(figsize=(12, 8))
+            fig, ax = self._acquire_fig((12, 8))
             
             # Create bar chart
             bars = ax.bar(range(len(plot_df)), plot_df[y_col])
@@ -156,59 +301,58 @@ class DataVisualization:
             ax.grid(True, alpha=0.3, axis='y')
             
             # Add value labels on bars
-            for i, bar in enumerate(bars):
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'{height:.1f}', ha='center', va='bottom')
+            ax.bar_label(bars, fmt='%.1f')
             
             # Adjust layout
-            plt.tight_layout()
+            fig.tight_layout()
             
             # Convert to base64
             data_uri = self._fig_to_base64(fig, max_size_kb)
-            plt.close(fig)
             
+            self._release_fig(fig)
             return data_uri
             
         except Exception as e:
             logger.error(f"Error creating bar chart: {str(e)}")
             return self._create_placeholder_plot(f"Error: {str(e)}")
     
-    def _fig_to_base64(self, fig, max_size_kb: int = 100) -> str:
-        """Convert matplotlib figure to base64 data URI with size optimization"""
+    def _fig_to_base64(self, fig, max_size_kb: Optional[int] = 100) -> str:
+        """Convert matplotlib figure to base64 data URI with size optimization
+        
+        Tries PNG at 100 and 72 dpi, WebP at quality 85 and 75, then PNG at
+        50 dpi, returning the first encoding within max_size_kb. Pass
+        max_size_kb=None to skip size checks and return the first PNG.
+        """
         try:
-            # Try different formats and qualities to meet size requirement
-            formats = [('png', 95), ('png', 85), ('png', 75), ('webp', 85), ('webp', 75)]
-            
-            for fmt, quality in formats:
-                buffer = io.BytesIO()
-                
-                if fmt == 'webp':
-                    # For WebP, we need to save as PNG first then convert
-                    fig.savefig(buffer, format='png', bbox_inches='tight', 
-                              facecolor='white', edgecolor='none', dpi=100)
-                    buffer.seek(0)
-                    
-                    # Convert to base64
-                    img_data = base64.b64encode(buffer.getvalue()).decode()
-                    data_uri = f"data:image/png;base64,{img_data}"
-                else:
-                    fig.savefig(buffer, format=fmt, bbox_inches='tight', 
-                              facecolor='white', edgecolor='none', dpi=100)
-                    buffer.seek(0)
-                    
-                    # Convert to base64
-                    img_data = base64.b64encode(buffer.getvalue()).decode()
-                    data_uri = f"data:image/{fmt};base64,{img_data}"
-                
-                # Check size
-                size_kb = len(img_data) / 1024
-                
-                if size_kb <= max_size_kb:
-                    logger.info(f"Generated plot: {size_kb:.1f}KB ({fmt})")
+            # Full-resolution PNG first; its bytes are kept as the source for WebP
+            full_png = io.BytesIO()
+            self._save_png(fig, full_png, dpi=100)
+            data_uri = self._encode_within_limit(full_png, 'png', max_size_kb, '100 dpi')
+            if data_uri is not None:
+                return data_uri
+            
+            # PNG is lossless, so only a lower DPI shrinks it; WebP trades quality for size,
+            # with the slower, tighter method=6 search saved for the smallest tier
+            full_png.seek(0)
+            image = Image.open(full_png)
+            fallbacks = [
+                ('png', '72 dpi', lambda buffer: self._save_png(fig, buffer, dpi=72)),
+                ('webp', 'quality 85', lambda buffer: image.save(buffer, format='WEBP', lossless=False,
+                                                                 quality=85, method=4)),
+                ('webp', 'quality 75', lambda buffer: image.save(buffer, format='WEBP', lossless=False,
+                                                                 quality=75, method=6)),
+                ('png', '50 dpi', lambda buffer: self._save_png(fig, buffer, dpi=50)),
+            ]
+            
+            # Every fallback encoding reuses one scratch buffer, rewound between attempts
+            scratch = io.BytesIO()
+            for fmt, detail, write in fallbacks:
+                scratch.seek(0)
+                scratch.truncate(0)
+                write(scratch)
+                data_uri = self._encode_within_limit(scratch, fmt, max_size_kb, detail)
+                if data_uri is not None:
                     return data_uri
-                
-                buffer.close()
             
             # If all formats are too large, return a minimal plot
             logger.warning(f"Plot too large, creating minimal version")
@@ -218,109 +362,198 @@ class DataVisualization:
             logger.error(f"Error converting figure to base64: {str(e)}")
             return self._create_placeholder_plot("Error generating plot")
     
+    def _save_png(self, fig, buffer: io.BytesIO, dpi: int) -> None:
+        """Render a figure into a buffer as PNG
+        
+        Figures are laid out with tight_layout before saving, so savefig does not
+        need bbox_inches='tight' and its extra measuring draw.
+        """
+        fig.savefig(buffer, format='png', facecolor='white', edgecolor='none', dpi=dpi,
+                    pil_kwargs={'compress_level': PNG_COMPRESS_LEVEL})
+    
+    def _encode_within_limit(self, buffer: io.BytesIO, fmt: str,
+                             max_size_kb: Optional[int], detail: str) -> Optional[str]:
+        """Return the buffer as a data URI, or None if it exceeds max_size_kb once encoded"""
+        # Base64 length is known from the byte count, so oversized images are never encoded
+        with buffer.getbuffer() as view:
+            size_kb = 4 * ((view.nbytes + 2) // 3) / 1024
+        if max_size_kb is not None and size_kb > max_size_kb:
+            return None
+        
+        logger.info(f"Generated plot: {size_kb:.1f}KB ({fmt}, {detail})")
+        return self._bytes_to_datauri(buffer, f"image/{fmt}".encode('ascii'))
+    
+    def _render_and_encode(self, fig: Figure, dpi: int = 100) -> str:
+        """Render a pooled figure to a PNG data URI and return the figure to the pool"""
+        buffer = getattr(self._png_buffers, 'buffer', None)
+        if buffer is None:
+            buffer = self._png_buffers.buffer = io.BytesIO()
+        buffer.seek(0)
+        buffer.truncate(0)
+        
+        try:
+            # Encode the Agg canvas's RGBA buffer directly instead of going through savefig
+            fig.set_dpi(dpi)
+            fig.canvas.draw()
+            rgba = np.asarray(fig.canvas.buffer_rgba())
+            Image.fromarray(rgba).save(buffer, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+            return self._bytes_to_datauri(buffer)
+        finally:
+            self._release_fig(fig)
+    
+    def _bytes_to_datauri(self, buffer: io.BytesIO, mime: bytes = b"image/png") -> str:
+        """Base64-encode a buffer's contents as a data URI, decoding to str only once"""
+        # Encode straight from the buffer's memory instead of copying it out first
+        with buffer.getbuffer() as view:
+            return (b"data:" + mime + b";base64," + base64.b64encode(view)).decode('ascii')
+    
     def _create_minimal_plot(self, original_fig) -> str:
         """Create a minimal version of the plot to meet size requirements"""
         try:
             # Create smaller figure
-            fig, ax = plt.subplots(figsize=(6, 4))
+            fig, ax = self._acquire_fig((6, 4))
             
             # Copy basic elements from original
             ax.text(0.5, 0.5, 'Data Visualization\n(Optimized for size)', 
                    ha='center', va='center', transform=ax.transAxes, fontsize=12)
             ax.set_title('Analysis Result')
+            fig.tight_layout()
             
             # Save with minimal settings
-            buffer = io.BytesIO()
-            fig.savefig(buffer, format='png', bbox_inches='tight', 
-                       facecolor='white', edgecolor='none', dpi=50)
-            buffer.seek(0)
-            
-            img_data = base64.b64encode(buffer.getvalue()).decode()
-            data_uri = f"data:image/png;base64,{img_data}"
-            
-            plt.close(fig)
-            buffer.close()
-            
-            return data_uri
+            return self._render_and_encode(fig, dpi=50)
             
         except Exception as e:
             logger.error(f"Error creating minimal plot: {str(e)}")
-            return "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+            return _FALLBACK_PNG_URI
     
     def _create_placeholder_plot(self, message: str) -> str:
         """Create a placeholder plot with error message"""
+        with self._placeholder_cache_lock:
+            cached = self._placeholder_cache.get(message)
+            if cached is not None:
+                self._placeholder_cache.move_to_end(message)
+                return cached
+        
         try:
-            fig, ax = plt.subplots(figsize=(8, 6))
+            fig, ax = self._acquire_fig((8, 6))
             ax.text(0.5, 0.5, message, ha='center', va='center', 
                    transform=ax.transAxes, fontsize=14, wrap=True)
             ax.set_title('Plot Generation Error')
             ax.axis('off')
+            fig.tight_layout()
             
-            buffer = io.BytesIO()
-            fig.savefig(buffer, format='png', bbox_inches='tight', 
-                       facecolor='white', edgecolor='none', dpi=80)
-            buffer.seek(0)
-            
-            img_data = base64.b64encode(buffer.getvalue()).decode()
-            data_uri = f"data:image/png;base64,{img_data}"
-            
-            plt.close(fig)
-            buffer.close()
+            data_uri = self._render_and_encode(fig, dpi=80)
             
+            # Error messages can embed arbitrary exception text, so the cache is bounded
+            with self._placeholder_cache_lock:
+                self._placeholder_cache[message] = data_uri
+                self._placeholder_cache.move_to_end(message)
+                while len(self._placeholder_cache) > PLACEHOLDER_CACHE_SIZE:
+                    self._placeholder_cache.popitem(last=False)
             return data_uri
             
         except Exception as e:
             logger.error(f"Error creating placeholder plot: {str(e)}")
-            return "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+            return _FALLBACK_PNG_URI
+
+    def _get_network_layout(self, graph: nx.Graph) -> Dict[Any, np.ndarray]:
+        """Return the spring layout for a graph, reusing it when the same graph is re-plotted"""
+        _lazy_init()
+        
+        # The seeded layout depends on node order as well as edges, so both form the key
+        key = (tuple(graph.nodes()), tuple(graph.edges()))
+        
+        with self._layout_cache_lock:
+            pos = self._layout_cache.get(key)
+            if pos is not None:
+                self._layout_cache.move_to_end(key)
+                return pos
+        
+        n = graph.number_of_nodes()
+        if ig is not None and n >= IGRAPH_LAYOUT_MIN_NODES:
+            pos = self._igraph_layout(graph)
+        elif n < SPRING_FULL_ITERATIONS_MAX_NODES:
+            pos = nx.spring_layout(graph, seed=42, k=2, iterations=50)
+        else:
+            # Each iteration is O(N²) (sparse past 500 nodes); fewer, with spacing scaled to N
+            pos = nx.spring_layout(graph, seed=42, k=2 / np.sqrt(n), iterations=15)
+        
+        with self._layout_cache_lock:
+            self._layout_cache[key] = pos
+            self._layout_cache.move_to_end(key)
+            while len(self._layout_cache) > LAYOUT_CACHE_SIZE:
+                self._layout_cache.popitem(last=False)
+        
+        return pos
+
+    def _igraph_layout(self, graph: nx.Graph) -> Dict[Any, np.ndarray]:
+        """Compute a Fruchterman-Reingold layout with igraph, keyed by networkx node"""
+        nodes = list(graph.nodes())
+        node_index = {node: i for i, node in enumerate(nodes)}
+        edges = [(node_index[u], node_index[v]) for u, v in graph.edges()]
+        
+        g = ig.Graph(n=len(nodes), edges=edges, directed=False)
+        # Seeded start positions; igraph still jitters nodes randomly, so repeat
+        # plots stay stable through the layout cache rather than the seed
+        start = np.random.default_rng(42).random((len(nodes), 2)).tolist()
+        coords = np.asarray(g.layout_fruchterman_reingold(niter=50, seed=start).coords)
+        
+        return dict(zip(nodes, coords))
 
     def create_network_graph(self, graph: nx.Graph) -> str:
         """Create a network graph visualization"""
         try:
-            fig, ax = plt.subplots(figsize=(10, 8))
+            fig, ax = self._acquire_fig((10, 8))
 
             # Create layout
-            pos = nx.spring_layout(graph, seed=42, k=2, iterations=50)
-
-            # Draw the network
-            nx.draw_networkx_nodes(graph, pos, node_color='lightblue',
-                                 node_size=1000, alpha=0.8, ax=ax)
-            nx.draw_networkx_edges(graph, pos, edge_color='gray',
-                                 width=2, alpha=0.6, ax=ax)
+            pos = self._get_network_layout(graph)
+
+            # Draw the network: one scatter for the nodes and one LineCollection for the edges
+            coords = np.array([pos[node] for node in graph.nodes()], dtype=np.float64).reshape(-1, 2)
+            ax.scatter(coords[:, 0], coords[:, 1], s=1000, c='lightblue', alpha=0.8, zorder=2)
+            
+            if nx.number_of_selfloops(graph):
+                # Self-loops need networkx's curved arrows
+                nx.draw_networkx_edges(graph, pos, edge_color='gray',
+                                     width=2, alpha=0.6, ax=ax)
+            else:
+                segments = np.array([(pos[u], pos[v]) for u, v in graph.edges()],
+                                    dtype=np.float64).reshape(-1, 2, 2)
+                edges = LineCollection(segments, colors='gray', linewidths=2, alpha=0.6, zorder=1)
+                ax.add_collection(edges)
+                
+                # Pad the view by 5% as draw_networkx_edges does
+                if len(coords):
+                    low, high = coords.min(axis=0), coords.max(axis=0)
+                    pad = 0.05 * (high - low)
+                    ax.update_datalim([low - pad, high + pad])
+                ax.autoscale_view()
+            
             nx.draw_networkx_labels(graph, pos, font_size=12,
                                   font_weight='bold', ax=ax)
 
             ax.set_title('Network Graph', fontsize=16, fontweight='bold')
             ax.axis('off')
 
-            plt.tight_layout()
+            fig.tight_layout()
 
             # Convert to base64
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                       dpi=100, facecolor='white')
-            buffer.seek(0)
-
-            img_data = base64.b64encode(buffer.getvalue()).decode()
-            data_uri = f"data:image/png;base64,{img_data}"
-
-            plt.close(fig)
-            buffer.close()
-
-            return data_uri
+            return self._render_and_encode(fig)
 
         except Exception as e:
             logger.error(f"Error creating network graph: {str(e)}")
-            return "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+            return _FALLBACK_PNG_URI
 
     def create_degree_histogram(self, degrees: Dict[str, int]) -> str:
         """Create a degree distribution histogram"""
         try:
-            fig, ax = plt.subplots(figsize=(10, 6))
+            fig, ax = self._acquire_fig((10, 6))
 
-            # Count degree frequencies
-            degree_counts = Counter(degrees.values())
-            degrees_list = list(degree_counts.keys())
-            counts_list = list(degree_counts.values())
+            # Count degree frequencies in one pass over a contiguous int array
+            degree_array = np.fromiter(degrees.values(), dtype=np.int64, count=len(degrees))
+            degree_counts = np.bincount(degree_array)
+            degrees_list = np.flatnonzero(degree_counts)
+            counts_list = degree_counts[degrees_list]
 
             # Create bar chart with green bars
             bars = ax.bar(degrees_list, counts_list, color='green', alpha=0.7, edgecolor='black')
@@ -331,35 +564,21 @@ class DataVisualization:
             ax.grid(True, alpha=0.3)
 
             # Add value labels on bars
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'{int(height)}', ha='center', va='bottom')
+            ax.bar_label(bars, fmt='%d')
 
-            plt.tight_layout()
+            fig.tight_layout()
 
             # Convert to base64
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                       dpi=100, facecolor='white')
-            buffer.seek(0)
-
-            img_data = base64.b64encode(buffer.getvalue()).decode()
-            data_uri = f"data:image/png;base64,{img_data}"
-
-            plt.close(fig)
-            buffer.close()
-
-            return data_uri
+            return self._render_and_encode(fig)
 
         except Exception as e:
             logger.error(f"Error creating degree histogram: {str(e)}")
-            return "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+            return _FALLBACK_PNG_URI
 
     def create_sales_bar_chart(self, region_sales: Dict[str, float]) -> str:
         """Create a bar chart of sales by region"""
         try:
-            fig, ax = plt.subplots(figsize=(10, 6))
+            fig, ax = self._acquire_fig((10, 6))
 
             regions = list(region_sales.keys())
             sales = list(region_sales.values())
@@ -373,42 +592,35 @@ class DataVisualization:
             ax.grid(True, alpha=0.3)
 
             # Add value labels on bars
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'{int(height)}', ha='center', va='bottom')
+            ax.bar_label(bars, fmt='%d')
 
-            plt.tight_layout()
+            fig.tight_layout()
 
             # Convert to base64
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                       dpi=100, facecolor='white')
-            buffer.seek(0)
-
-            img_data = base64.b64encode(buffer.getvalue()).decode()
-            data_uri = f"data:image/png;base64,{img_data}"
-
-            plt.close(fig)
-            buffer.close()
-
-            return data_uri
+            return self._render_and_encode(fig)
 
         except Exception as e:
             logger.error(f"Error creating sales bar chart: {str(e)}")
-            return "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+            return _FALLBACK_PNG_URI
 
     def create_cumulative_sales_chart(self, sales_df) -> str:
         """Create a cumulative sales line chart"""
         try:
-            fig, ax = plt.subplots(figsize=(10, 6))
+            fig, ax = self._acquire_fig((10, 6))
 
-            # Sort by date and calculate cumulative sales
-            sales_df_sorted = sales_df.sort_values('date')
-            sales_df_sorted['cumulative_sales'] = sales_df_sorted['sales'].cumsum()
+            # Sort by date and calculate cumulative sales on plain arrays. Sorting the
+            # column (rather than Series.argsort) keeps missing dates last on pandas 2.x too
+            order = sales_df['date'].reset_index(drop=True).sort_values(kind='stable').index.to_numpy()
+            dates = sales_df['date'].to_numpy()[order]
+            cumulative_sales = np.nancumsum(
+                sales_df['sales'].to_numpy(dtype=np.float64, na_value=np.nan)[order])
 
             # Create line chart with red line
-            ax.plot(sales_df_sorted['date'], sales_df_sorted['cumulative_sales'],
+            positions = self._decimation_positions(len(dates))
+            if positions is not None:
+                dates = dates[positions]
+                cumulative_sales = cumulative_sales[positions]
+            ax.plot(dates, cumulative_sales,
                    color='red', linewidth=2, marker='o')
 
             ax.set_xlabel('Date', fontsize=12)
@@ -417,34 +629,24 @@ class DataVisualization:
             ax.grid(True, alpha=0.3)
 
             # Rotate x-axis labels for better readability
-            plt.xticks(rotation=45)
-            plt.tight_layout()
+            ax.tick_params(axis='x', labelrotation=45)
+            fig.tight_layout()
 
             # Convert to base64
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                       dpi=100, facecolor='white')
-            buffer.seek(0)
-
-            img_data = base64.b64encode(buffer.getvalue()).decode()
-            data_uri = f"data:image/png;base64,{img_data}"
-
-            plt.close(fig)
-            buffer.close()
-
-            return data_uri
+            return self._render_and_encode(fig)
 
         except Exception as e:
             logger.error(f"Error creating cumulative sales chart: {str(e)}")
-            return "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+            return _FALLBACK_PNG_URI
 
     def create_temperature_line_chart(self, weather_df) -> str:
         """Create a temperature over time line chart"""
         try:
-            fig, ax = plt.subplots(figsize=(10, 6))
+            fig, ax = self._acquire_fig((10, 6))
 
             # Create line chart with red line
-            ax.plot(weather_df['date'], weather_df['temperature_c'],
+            plot_df = self._decimate(weather_df)
+            ax.plot(plot_df['date'], plot_df['temperature_c'],
                    color='red', linewidth=2, marker='o')
 
             ax.set_xlabel('Date', fontsize=12)
@@ -453,31 +655,20 @@ class DataVisualization:
             ax.grid(True, alpha=0.3)
 
             # Rotate x-axis labels for better readability
-            plt.xticks(rotation=45)
-            plt.tight_layout()
+            ax.tick_params(axis='x', labelrotation=45)
+            fig.tight_layout()
 
             # Convert to base64
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                       dpi=100, facecolor='white')
-            buffer.seek(0)
-
-            img_data = base64.b64encode(buffer.getvalue()).decode()
-            data_uri = f"data:image/png;base64,{img_data}"
-
-            plt.close(fig)
-            buffer.close()
-
-            return data_uri
+            return self._render_and_encode(fig)
 
         except Exception as e:
             logger.error(f"Error creating temperature line chart: {str(e)}")
-            return "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+            return _FALLBACK_PNG_URI
 
     def create_precipitation_histogram(self, weather_df) -> str:
         """Create a precipitation histogram"""
         try:
-            fig, ax = plt.subplots(figsize=(10, 6))
+            fig, ax = self._acquire_fig((10, 6))
 
             # Create histogram with orange bars
             ax.hist(weather_df['precip_mm'], bins=5, color='orange',
@@ -488,22 +679,11 @@ class DataVisualization:
             ax.set_title('Precipitation Distribution', fontsize=16, fontweight='bold')
             ax.grid(True, alpha=0.3)
 
-            plt.tight_layout()
+            fig.tight_layout()
 
             # Convert to base64
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                       dpi=100, facecolor='white')
-            buffer.seek(0)
-
-            img_data = base64.b64encode(buffer.getvalue()).decode()
-            data_uri = f"data:image/png;base64,{img_data}"
-
-            plt.close(fig)
-            buffer.close()
-
-            return data_uri
+            return self._render_and_encode(fig)
 
         except Exception as e:
             logger.error(f"Error creating precipitation histogram: {str(e)}")
-            return "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+            return _FALLBACK_PNG_URI
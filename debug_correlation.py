@@ -37,12 +37,13 @@ print(f'Method 1 (direct): {df["day"].corr(df["sales"])}')
 print(f'Method 2 (numpy): {np.corrcoef(df["day"], df["sales"])[0,1]}')
 
 # Method 3: Manual calculation
-x = df['day'].values
-y = df['sales'].values
-mean_x = np.mean(x)
-mean_y = np.mean(y)
-numerator = np.sum((x - mean_x) * (y - mean_y))
-denominator = np.sqrt(np.sum((x - mean_x)**2) * np.sum((y - mean_y)**2))
+x = df['day'].to_numpy(dtype=np.float64)
+y = df['sales'].to_numpy(dtype=np.float64)
+# Centre once, then every sum is a dot product over the two centred arrays
+xc = x - x.mean()
+yc = y - y.mean()
+numerator = xc @ yc
+denominator = np.sqrt((xc @ xc) * (yc @ yc))
 manual_corr = numerator / denominator
 print(f'Method 3 (manual): {manual_corr}')
 
@@ -3,17 +3,106 @@ import requests
 import os
 import logging
 import json
-from typing import Dict, Any, List, Optional
+import threading
+import zlib
+import re
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Numeric literals (thresholds, years) and words that must match exactly between cached questions
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+_WORD_RE = re.compile(r'[a-z]+')
+# Function words that may differ between paraphrases; negations are deliberately absent
+_STOP_WORDS = frozenset({
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'what', 'whats', 'which', 's',
+    'of', 'in', 'on', 'for', 'to', 'and', 'or', 'by', 'with', 'from', 'this', 'that',
+    'me', 'please', 'can', 'you', 'tell', 'do', 'does', 'give', 'show', 'find'
+})
+
+def _question_key(text: str) -> Tuple[frozenset, Tuple[float, ...]]:
+    """Return the content words and numbers a cached question must share with a lookup"""
+    lowered = text.lower()
+    words = frozenset(_WORD_RE.findall(lowered)) - _STOP_WORDS
+    return words, tuple(float(n) for n in _NUMBER_RE.findall(lowered))
+
+class SemanticCache:
+    """Similarity cache for LLM analysis plans keyed by question text
+
+    Questions are embedded as L2-normalised hashed character trigram vectors so
+    lookups are a single matrix-vector product against the stored embeddings.
+    A lookup only hits when the best cosine similarity exceeds the threshold and
+    the tag (e.g. the uploaded file names), the content words and the numbers
+    in the question match exactly. Rephrasings that only change case,
+    spacing, punctuation or function words still hit, while "highest" never
+    reuses a plan for "lowest" and "before 2000" never reuses one for "before 2010".
+    """
+
+    def __init__(self, threshold: float = 0.9, max_entries: int = 256, dim: int = 1024):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.dim = dim
+        self._embeddings = np.zeros((max_entries, dim), dtype=np.float32)
+        self._entries = []  # parallel to the first len(_entries) rows: [tag, key, value, last_used]
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Embed text as a normalised hashed character trigram vector"""
+        normalized = ' '.join(text.lower().split())
+        vec = np.zeros(self.dim, dtype=np.float32)
+        if len(normalized) < 3:
+            normalized = normalized.ljust(3)
+        buckets = [zlib.crc32(normalized[i:i + 3].encode('utf-8')) % self.dim
+                   for i in range(len(normalized) - 2)]
+        np.add.at(vec, buckets, 1.0)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def get(self, text: str, tag: Any = None) -> Optional[Any]:
+        """Return the cached value for a sufficiently similar question, or None"""
+        emb = self._embed(text)
+        key = _question_key(text)
+        with self._lock:
+            n = len(self._entries)
+            if not n:
+                return None
+            scores = self._embeddings[:n] @ emb
+            for idx in np.argsort(scores)[::-1]:
+                if scores[idx] < self.threshold:
+                    break
+                entry = self._entries[idx]
+                if entry[0] == tag and entry[1] == key:
+                    self._clock += 1
+                    entry[3] = self._clock
+                    logger.info(f"Semantic cache hit (similarity {scores[idx]:.3f})")
+                    return entry[2]
+        return None
+
+    def put(self, text: str, value: Any, tag: Any = None) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        emb = self._embed(text)
+        key = _question_key(text)
+        with self._lock:
+            self._clock += 1
+            if len(self._entries) < self.max_entries:
+                idx = len(self._entries)
+                self._entries.append([tag, key, value, self._clock])
+            else:
+                idx = min(range(len(self._entries)), key=lambda i: self._entries[i][3])
+                self._entries[idx] = [tag, key, value, self._clock]
+            self._embeddings[idx] = emb
+
+
 class LLMIntegration:
     """Handles integration with LLM APIs for intelligent question processing"""
 
     def __init__(self):
         self.openai_client = None
         self.aipipe_client = None
+        self.plan_cache = SemanticCache()
 
         # Initialize OpenAI client if API key is available
         if os.getenv('OPENAI_API_KEY'):
@@ -38,15 +127,22 @@ class LLMIntegration:
             if not self.openai_client and not self.aipipe_client:
                 return self._fallback_response(question, uploaded_files)
 
-            # Analyze the question to understand what's needed
-            analysis_prompt = self._create_analysis_prompt(question, uploaded_files)
+            # Reuse the plan from a near-identical earlier question over the same files
+            cache_tag = tuple(sorted(uploaded_files)) if uploaded_files else ()
+            response = self.plan_cache.get(question, cache_tag)
 
-            # Get LLM response - try OpenAI first, then aipipe
-            response = None
-            if self.openai_client:
-                response = self._query_openai(analysis_prompt)
-            elif self.aipipe_client:
-                response = self._query_aipipe(analysis_prompt)
+            if response is None:
+                # Analyze the question to understand what's needed
+                analysis_prompt = self._create_analysis_prompt(question, uploaded_files)
+
+                # Get LLM response - try OpenAI first, then aipipe
+                if self.openai_client:
+                    response = self._query_openai(analysis_prompt)
+                elif self.aipipe_client:
+                    response = self._query_aipipe(analysis_prompt)
+
+                if response and response != self._default_analysis_plan():
+                    self.plan_cache.put(question, response, cache_tag)
 
             if response:
                 # Process the LLM response and execute the analysis
@@ -201,12 +297,13 @@ class LLMIntegration:
             data_analysis = DataAnalysis()
             
             results = []
+            # Resolve the numeric columns once rather than per step
+            numeric_cols = data.select_dtypes(include=['number']).columns.tolist()
             
             for step in steps:
                 step_lower = step.lower()
                 
                 if 'correlation' in step_lower:
-                    numeric_cols = data.select_dtypes(include=['number']).columns.tolist()
                     if len(numeric_cols) >= 2:
                         corr = data_analysis.calculate_correlation(data, numeric_cols[0], numeric_cols[1])
                         results.append(corr)
@@ -215,7 +312,6 @@ class LLMIntegration:
                     results.append(len(data))
                 
                 elif 'mean' in step_lower or 'average' in step_lower:
-                    numeric_cols = data.select_dtypes(include=['number']).columns.tolist()
                     if numeric_cols:
                         results.append(data[numeric_cols[0]].mean())
             
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import logging
+from typing import Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernels run as plain Python without it
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+def build_csr(edges_df: pd.DataFrame, source: str = 'source',
+              target: str = 'target') -> Tuple[np.ndarray, np.ndarray, List[Any], int]:
+    """Encode an undirected edge list as CSR adjacency arrays
+
+    Nodes are numbered in order of first appearance (source before target, row
+    by row), matching the node order of nx.from_pandas_edgelist. Duplicate
+    edges are collapsed and a self-loop appears twice in its node's row, so
+    row lengths equal NetworkX degrees.
+
+    Returns (indptr, indices, nodes, edge_count).
+    """
+    pairs = edges_df[[source, target]].to_numpy()
+    codes, uniques = pd.factorize(pairs.ravel())
+    nodes = uniques.tolist()
+    n = len(nodes)
+
+    codes = codes.reshape(-1, 2)
+    # Canonicalise (u, v) with u <= v and drop duplicate undirected edges
+    codes = np.unique(np.sort(codes, axis=1), axis=0)
+    edge_count = len(codes)
+
+    src = np.concatenate([codes[:, 0], codes[:, 1]])
+    dst = np.concatenate([codes[:, 1], codes[:, 0]])
+    order = np.argsort(src, kind='stable')
+    indices = dst[order].astype(np.int64)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+
+    return indptr, indices, nodes, edge_count
+
+
+@njit(cache=True)
+def _degree_stats(indptr, n):
+    """Return (degrees, argmax degree, mean degree) from CSR row pointers"""
+    degrees = np.empty(n, dtype=np.int64)
+    best = 0
+    total = 0
+    for i in range(n):
+        d = indptr[i + 1] - indptr[i]
+        degrees[i] = d
+        total += d
+        if d > degrees[best]:
+            best = i
+    return degrees, best, total / n
+
+
+@njit(cache=True)
+def _bfs_shortest_path(indptr, indices, src, dst):
+    """Return the hop count from src to dst, or -1 when unreachable"""
+    n = indptr.shape[0] - 1
+    dist = np.full(n, -1, dtype=np.int64)
+    queue = np.empty(n, dtype=np.int64)
+    dist[src] = 0
+    queue[0] = src
+    head = 0
+    tail = 1
+    while head < tail:
+        u = queue[head]
+        head += 1
+        if u == dst:
+            return dist[u]
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if dist[v] < 0:
+                dist[v] = dist[u] + 1
+                queue[tail] = v
+                tail += 1
+    return -1
@@ -5,6 +5,27 @@ from typing import List, Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Extraction patterns, compiled once at import
+_URL_RE = re.compile(r'https?://[^\s]+')
+_NUMBERED_QUESTION_RE = re.compile(r'\d+\.\s*([^?\n]+\??)')
+_JSON_OBJECT_RE = re.compile(r'\{[^}]+\}', re.DOTALL)
+_QUESTION_SPLIT_RE = re.compile(r'[?\n]\s*(?=\d+\.|\w)')
+_YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+_MONEY_RES = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'\$(\d+(?:\.\d+)?)\s*bn',
+    r'\$(\d+(?:\.\d+)?)\s*billion',
+    r'(\d+(?:\.\d+)?)\s*billion'
+)]
+_COLUMN_RES = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'between\s+(\w+)\s+and\s+(\w+)',
+    r'correlation.*?(\w+).*?(\w+)',
+    r'plot.*?(\w+).*?(\w+)'
+)]
+
+def _any_of(patterns: List[str]) -> re.Pattern:
+    """Compile a pattern list into one alternation, so a single scan tests them all"""
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+
 class QuestionProcessor:
     """Processes and parses natural language questions to determine analysis requirements"""
     
@@ -60,6 +81,15 @@ class QuestionProcessor:
             'latest': [r'latest', r'most recent', r'newest'],
             'plot': [r'plot', r'chart', r'graph', r'scatterplot', r'visualization']
         }
+        
+        # One combined matcher per pattern family
+        self._wikipedia_re = _any_of(self.wikipedia_patterns)
+        self._database_re = _any_of(self.database_patterns)
+        self._network_re = _any_of(self.network_patterns)
+        self._sales_re = _any_of(self.sales_patterns)
+        self._weather_re = _any_of(self.weather_patterns)
+        self._analysis_res = {analysis_type: _any_of(patterns)
+                              for analysis_type, patterns in self.analysis_patterns.items()}
     
     def parse_questions(self, questions_content: str) -> List[Dict[str, Any]]:
         """Parse questions content and return structured question data"""
@@ -98,22 +128,22 @@ class QuestionProcessor:
     def _is_wikipedia_question(self, content: str) -> bool:
         """Check if this is a Wikipedia scraping question"""
         content_lower = content.lower()
-        return any(re.search(pattern, content_lower) for pattern in self.wikipedia_patterns)
+        return self._wikipedia_re.search(content_lower) is not None
     
     def _is_database_question(self, content: str) -> bool:
         """Check if this is a database analysis question"""
         content_lower = content.lower()
-        return any(re.search(pattern, content_lower) for pattern in self.database_patterns)
+        return self._database_re.search(content_lower) is not None
     
     def _parse_wikipedia_questions(self, content: str) -> List[Dict[str, Any]]:
         """Parse Wikipedia scraping questions"""
         try:
             # Extract URL
-            url_match = re.search(r'https?://[^\s]+', content)
+            url_match = _URL_RE.search(content)
             url = url_match.group(0) if url_match else 'https://en.wikipedia.org/wiki/List_of_highest-grossing_films'
             
             # Extract numbered questions
-            questions = re.findall(r'\d+\.\s*([^?\n]+\??)', content)
+            questions = _NUMBERED_QUESTION_RE.findall(content)
             
             return [{
                 'type': 'wikipedia_scraping',
@@ -130,7 +160,7 @@ class QuestionProcessor:
         """Parse database analysis questions"""
         try:
             # Look for JSON structure in the content
-            json_match = re.search(r'\{[^}]+\}', content, re.DOTALL)
+            json_match = _JSON_OBJECT_RE.search(content)
             
             questions_dict = {}
             if json_match:
@@ -153,7 +183,7 @@ class QuestionProcessor:
         """Parse generic questions"""
         try:
             # Split by question marks or numbered items
-            questions = re.split(r'[?\n]\s*(?=\d+\.|\w)', content)
+            questions = _QUESTION_SPLIT_RE.split(content)
             questions = [q.strip() for q in questions if q.strip()]
             
             parsed_questions = []
@@ -175,9 +205,9 @@ class QuestionProcessor:
         """Classify the type of question"""
         question_lower = question.lower()
         
-        if any(re.search(pattern, question_lower) for pattern in self.wikipedia_patterns):
+        if self._wikipedia_re.search(question_lower):
             return 'wikipedia_scraping'
-        elif any(re.search(pattern, question_lower) for pattern in self.database_patterns):
+        elif self._database_re.search(question_lower):
             return 'database_analysis'
         elif 'csv' in question_lower or 'data' in question_lower:
             return 'file_analysis'
@@ -189,8 +219,8 @@ class QuestionProcessor:
         question_lower = question.lower()
         analysis_types = []
         
-        for analysis_type, patterns in self.analysis_patterns.items():
-            if any(re.search(pattern, question_lower) for pattern in patterns):
+        for analysis_type, pattern in self._analysis_res.items():
+            if pattern.search(question_lower):
                 analysis_types.append(analysis_type)
         
         return analysis_types if analysis_types else ['general']
@@ -200,32 +230,20 @@ class QuestionProcessor:
         params = {}
         
         # Extract years
-        years = re.findall(r'\b(19|20)\d{2}\b', question)
+        years = _YEAR_RE.findall(question)
         if years:
             params['years'] = [int(year) for year in years]
         
         # Extract monetary amounts
-        money_patterns = [
-            r'\$(\d+(?:\.\d+)?)\s*bn',
-            r'\$(\d+(?:\.\d+)?)\s*billion',
-            r'(\d+(?:\.\d+)?)\s*billion'
-        ]
-        
-        for pattern in money_patterns:
-            matches = re.findall(pattern, question, re.IGNORECASE)
+        for pattern in _MONEY_RES:
+            matches = pattern.findall(question)
             if matches:
                 params['amounts'] = [float(match) for match in matches]
                 break
         
         # Extract column names (common patterns)
-        column_patterns = [
-            r'between\s+(\w+)\s+and\s+(\w+)',
-            r'correlation.*?(\w+).*?(\w+)',
-            r'plot.*?(\w+).*?(\w+)'
-        ]
-        
-        for pattern in column_patterns:
-            match = re.search(pattern, question, re.IGNORECASE)
+        for pattern in _COLUMN_RES:
+            match = pattern.search(question)
             if match:
                 params['columns'] = list(match.groups())
                 break
@@ -255,7 +273,7 @@ class QuestionProcessor:
     def _is_network_question(self, content: str) -> bool:
         """Check if the content contains network analysis questions"""
         content_lower = content.lower()
-        return any(re.search(pattern, content_lower) for pattern in self.network_patterns)
+        return self._network_re.search(content_lower) is not None
 
     def _parse_network_questions(self, content: str) -> List[Dict[str, Any]]:
         """Parse network analysis questions"""
@@ -276,7 +294,7 @@ class QuestionProcessor:
     def _is_sales_question(self, content: str) -> bool:
         """Check if the content contains sales analysis questions"""
         content_lower = content.lower()
-        return any(re.search(pattern, content_lower) for pattern in self.sales_patterns)
+        return self._sales_re.search(content_lower) is not None
 
     def _parse_sales_questions(self, content: str) -> List[Dict[str, Any]]:
         """Parse sales analysis questions"""
@@ -297,7 +315,7 @@ class QuestionProcessor:
     def _is_weather_question(self, content: str) -> bool:
         """Check if the content contains weather analysis questions"""
         content_lower = content.lower()
-        return any(re.search(pattern, content_lower) for pattern in self.weather_patterns)
+        return self._weather_re.search(content_lower) is not None
 
     def _parse_weather_questions(self, content: str) -> List[Dict[str, Any]]:
         """Parse weather analysis questions"""
@@ -3,6 +3,7 @@ import json
 import tempfile
 import os
 from io import BytesIO
+from unittest.mock import patch
 from app import app
 import logging
 
@@ -157,6 +158,18 @@ class TestDataAnalystAgent(unittest.TestCase):
         self.assertIn('error', result)
         self.assertIn('empty', result['error'])
     
+    def test_oversized_questions_file(self):
+        """Test that questions.txt over 1MB is rejected"""
+        data = {
+            'questions.txt': (BytesIO(b'a' * (1024 * 1024 + 1)), 'questions.txt')
+        }
+        
+        response = self.app.post('/api/', data=data, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 400)
+        
+        result = json.loads(response.data)
+        self.assertIn('too large', result['error'])
+    
     def test_json_serialization(self):
         """Test that responses are JSON serializable"""
         questions_content = "What is 2 + 2?"
@@ -209,6 +222,145 @@ class TestDataModules(unittest.TestCase):
         llm = LLMIntegration()
         self.assertIsNotNone(llm)
 
+    def test_json_provider_handles_numpy_values(self):
+        """Test that numpy scalars and arrays serialize in API responses"""
+        import numpy as np
+        with app.app_context():
+            data = json.loads(app.json.dumps({'count': np.int64(3), 'values': np.array([0.5, 1.5])}))
+        self.assertEqual(data, {'count': 3, 'values': [0.5, 1.5]})
+
+    def test_group_and_count_with_nullable_column(self):
+        """Test that missing values in a nullable filter column are excluded, not fatal"""
+        import pandas as pd
+        from data_analysis import DataAnalysis
+        df = pd.DataFrame({'g': ['a', 'b', 'b', 'c'],
+                           'v': pd.array([None, 5, 7, 9], dtype='Int64')})
+        result = DataAnalysis().group_and_count(df, 'g', {'v': {'min': 5}})
+        self.assertEqual(result.to_dict('records'),
+                         [{'g': 'b', 'count': 2}, {'g': 'c', 'count': 1}])
+
+    def test_network_kernels_match_networkx(self):
+        """Test CSR degree and shortest-path kernels against networkx, compiled and pure-Python"""
+        import networkx as nx
+        import pandas as pd
+        import network_kernels
+
+        # Duplicate edge, self-loop and a separate component
+        edges = pd.DataFrame({'source': ['Alice', 'Bob', 'Alice', 'Carol', 'Dave', 'Bob', 'Eve', 'Frank'],
+                              'target': ['Bob', 'Carol', 'Carol', 'Dave', 'Eve', 'Alice', 'Eve', 'Grace']})
+        G = nx.from_pandas_edgelist(edges, source='source', target='target')
+        indptr, indices, nodes, edge_count = network_kernels.build_csr(edges)
+        self.assertEqual(nodes, list(G.nodes()))
+        self.assertEqual(edge_count, G.number_of_edges())
+
+        kernels = {'default': (network_kernels._degree_stats, network_kernels._bfs_shortest_path)}
+        if hasattr(network_kernels._degree_stats, 'py_func'):
+            # numba is installed, so also exercise the uncompiled fallback bodies
+            kernels['python'] = (network_kernels._degree_stats.py_func,
+                                 network_kernels._bfs_shortest_path.py_func)
+
+        degrees = dict(G.degree())
+        for name, (degree_stats, bfs) in kernels.items():
+            with self.subTest(kernels=name):
+                degree_array, best, mean = degree_stats(indptr, len(nodes))
+                self.assertEqual(dict(zip(nodes, degree_array.tolist())), degrees)
+                self.assertEqual(nodes[best], max(degrees, key=degrees.get))
+                self.assertAlmostEqual(float(mean), sum(degrees.values()) / len(nodes))
+                for i, u in enumerate(nodes):
+                    for j, v in enumerate(nodes):
+                        expected = nx.shortest_path_length(G, u, v) if nx.has_path(G, u, v) else -1
+                        self.assertEqual(int(bfs(indptr, indices, i, j)), expected)
+
+    def test_load_csv_matches_pandas_on_messy_input(self):
+        """Test that uploads keep pandas' parsing of NA tokens, blanks, bool-like and zero-padded values"""
+        import pandas as pd
+        from data_sourcing import DataSourcing
+
+        content = ('num_na,int_blank,yn,tf,code,flag\n'
+                   '1.5,1,yes,t,007,True\n'
+                   'NA,,no,f,010,False\n'
+                   'null,3,yes,t,123,True\n')
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(content)
+        try:
+            ds = DataSourcing()
+            df = ds.load_csv(f.name)
+            pd.testing.assert_frame_equal(df, pd.read_csv(f.name))
+            self.assertEqual(df['code'].tolist(), [7, 10, 123])
+            self.assertTrue(pd.api.types.is_float_dtype(df['num_na']))
+            self.assertTrue(pd.api.types.is_float_dtype(df['int_blank']))
+            ds.close()
+        finally:
+            os.unlink(f.name)
+
+    def test_cumulative_sales_chart_orders_missing_dates_last(self):
+        """Test that a row with a missing date is plotted last, as with sort_values"""
+        import pandas as pd
+        from data_visualization import DataVisualization
+
+        dv = DataVisualization()
+        df = pd.DataFrame({'date': pd.to_datetime(['2024-01-03', None, '2024-01-01', '2024-01-02']),
+                           'sales': [30, 99, 10, 20]}, index=[7, 5, 3, 1])
+        chart = dv.create_cumulative_sales_chart(df)
+        self.assertTrue(chart.startswith('data:image/png;base64,'))
+        self.assertEqual(chart, dv.create_cumulative_sales_chart(df.sort_values('date')))
+
+    def test_semantic_cache_matches_paraphrase(self):
+        """Test that the LLM plan cache hits on rephrasings but not on new questions"""
+        from llm_integration import SemanticCache
+        cache = SemanticCache()
+        cache.put('What is the correlation between Rank and Peak?', {'analysis_type': 'statistical'}, ())
+
+        self.assertIsNotNone(cache.get('what is the  correlation between rank and peak', ()))
+        self.assertIsNone(cache.get('What is the correlation between Rank and Peak?', ('data.csv',)))
+        self.assertIsNone(cache.get('How many films were released before 2000?', ()))
+
+    def test_semantic_cache_misses_on_different_numbers(self):
+        """Test that questions differing only in thresholds or years do not share a plan"""
+        from llm_integration import SemanticCache
+        cache = SemanticCache()
+        cache.put('How many $2 bn movies were released before 2000?', {'analysis_type': 'statistical'}, ())
+
+        self.assertIsNotNone(cache.get('how many $2 bn movies were released before 2000', ()))
+        self.assertIsNone(cache.get('How many $2 bn movies were released before 2010?', ()))
+        self.assertIsNone(cache.get('How many $1.5 bn movies were released before 2000?', ()))
+
+    def test_semantic_cache_misses_on_opposite_words(self):
+        """Test that questions differing by one content word do not share a plan"""
+        from llm_integration import SemanticCache
+        cache = SemanticCache()
+        cache.put('Which region has the highest total sales across all orders in the dataset?',
+                  {'analysis_type': 'statistical'}, ())
+        cache.put('What is the maximum value of the temperature column in the weather data?',
+                  {'analysis_type': 'statistical'}, ())
+
+        self.assertIsNotNone(cache.get('which region has the highest total sales across all orders in the dataset', ()))
+        self.assertIsNone(cache.get('Which region has the lowest total sales across all orders in the dataset?', ()))
+        self.assertIsNone(cache.get('What is the minimum value of the temperature column in the weather data?', ()))
+
+    def test_wikipedia_data_cached_by_url(self):
+        """Test that scraped Wikipedia data is reused for the same URL as independent copies"""
+        import time
+        import pandas as pd
+        import app as app_module
+        import data_sourcing
+
+        url = 'https://example.org/wiki/Cache_test'
+        html = (b'<table class="wikitable"><tr><th>Rank</th><th>Peak</th><th>Title</th>'
+                b'<th>Worldwide gross</th><th>Year</th></tr>'
+                b'<tr><td>1</td><td>1</td><td>A</td><td>2100</td><td>1997</td></tr>'
+                b'<tr><td>2</td><td>2</td><td>B</td><td>1600</td><td>2009</td></tr></table>')
+        with patch.object(app_module.data_sourcing, '_fetch_html',
+                          return_value=(html, time.time())) as fetch:
+            first = app_module.data_sourcing.scrape_wikipedia(url)
+            first.loc[0, 'Title'] = 'mutated'
+            second = app_module.data_sourcing.scrape_wikipedia(url)
+        data_sourcing._scrape_cache.pop(url, None)
+
+        fetch.assert_called_once_with(url)
+        self.assertIsNot(first, second)
+        self.assertEqual(second['Title'].tolist(), ['A', 'B'])
+        self.assertTrue(pd.api.types.is_numeric_dtype(second['Year']))
 
 if __name__ == '__main__':
     # Run tests